@@ -1,42 +1,96 @@
-import aiohttp
+import asyncio
+import functools
+import httpx
+import ijson
+import orjson
+import random
+import time
 
 from typing import Any, Dict, List, Tuple, Optional
 
 import utils
 
+# Cap the number of in-flight Deribit requests so a large strike grid cannot
+# trip the per-connection rate limit and degenerate into retry storms
+_request_limiter = asyncio.Semaphore(20)
 
-async def fetch_data(session: aiohttp.ClientSession, url: str, params: Dict[str, Any], retries: int = 5) -> Optional[Dict]:
+
+def ttl_cached(ttl: float):
+    """
+    Cache an async fetcher's result for ttl seconds.
+
+    Entries are keyed by every argument except the leading client, so repeated
+    calls within the TTL skip the HTTP round trip entirely. Failed fetches
+    (None results) are not cached.
+
+    Args:
+        ttl (float): Seconds a cached value stays valid.
+    """
+    def decorator(fn):
+        cache = {}
+
+        @functools.wraps(fn)
+        async def wrapper(client, *args):
+            now = time.monotonic()
+            hit = cache.get(args)
+            if hit is not None and hit[1] > now:
+                return hit[0]
+            value = await fn(client, *args)
+            if value is not None:
+                cache[args] = (value, now + ttl)
+            return value
+        return wrapper
+    return decorator
+
+
+async def fetch_data(client: httpx.AsyncClient, url: str, params: Dict[str, Any], retries: int = 5, raw: bool = False) -> Optional[Any]:
     """
     Helper function to fetch data from an API with retry logic.
 
     Args:
-        sesssion (aiohttp.ClientSession): Client sesssion.
+        client (httpx.AsyncClient): HTTP client.
         url (str): The API endpoint URL.
         params (Dict[str, Any]): Query parameters for the API request.
         retries (int): Number of retry attempts if the request fails.
+        raw (bool): Return the undecoded response body instead of the parsed "result".
 
     Returns:
-        Optional[Dict]: The JSON response from the API, or None if the request fails.
+        Optional[Any]: The "result" field of the JSON response (or the raw body
+        bytes if raw=True), or None if the request fails.
     """
     for attempt in range(retries):
         try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if "result" in data:
-                        return data["result"]
-                    else:
-                        print(f"Unexpected response format: {data}")
+            async with _request_limiter:
+                response = await client.get(url, params=params)
+            if response.status_code == 200:
+                if raw:
+                    return response.content
+                # orjson decodes the larger Deribit payloads (book summary)
+                # noticeably faster than the stdlib json used by response.json()
+                data = orjson.loads(response.content)
+                if "result" in data:
+                    return data["result"]
                 else:
-                    print(f"Attempt {attempt + 1} failed with status {response.status}")
+                    print(f"Unexpected response format: {data}")
+            else:
+                print(f"Attempt {attempt + 1} failed with status {response.status_code}")
+                # Client errors other than rate limiting will not succeed on retry
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    break
         except Exception as e:
             print(f"Attempt {attempt + 1} failed with exception: {e}")
 
+        # Back off with jitter before retrying so a struggling endpoint
+        # is not hammered with immediate repeat requests
+        if attempt < retries - 1:
+            delay = min(0.1 * 2 ** attempt, 2.0) + random.random() * 0.1
+            await asyncio.sleep(delay)
+
     print(f"Failed to fetch data from {url} after {retries} retries")
     return None
 
 async def get_strike_iv_price_dict(
-        session: aiohttp.ClientSession,
+        client: httpx.AsyncClient,
         currency: str,
         expiry_code: str
 ) -> Tuple:
@@ -44,7 +98,7 @@ async def get_strike_iv_price_dict(
     Fetch dictionary that maps strike price to their mark_iv and mark_price
 
     Args:
-        sesssion (aiohttp.ClientSession): Client sesssion.
+        client (httpx.AsyncClient): HTTP client.
         currency (str): The currency for which to fetch the index price (e.g., 'BTC', 'ETH').
         expiry_code (str): The expiry code (e.g., '9MAY25').
 
@@ -58,45 +112,42 @@ async def get_strike_iv_price_dict(
         "kind": "option"}
 
     try:
-        data = await fetch_data(session, url, params)
+        raw = await fetch_data(client, url, params, raw=True)
     except Exception as e:
         print(f"Could not get strike iv dictionary for {currency}")
         return None
-    
-    # Filter and process the data
-    filtered = []
-    for item in data:
-        if expiry_code in item["instrument_name"] and item["mark_iv"] is not None:
-            filtered.append(
-                {
-                    "instrument_name": item["instrument_name"],
-                    "mark_iv": item["mark_iv"] / 100,  # Convert percentage to decimal
-                    'mark_price': item["mark_price"],
-                    "strike": utils.process_strike(item["instrument_name"].split("-")[-2]),
-                    "option_type": item["instrument_name"].split("-")[-1],  # C or P
-                }
-            )
 
+    # Stream-decode the payload and filter as we go: only a small fraction of
+    # the instruments match the expiry, so most rows are skipped before any
+    # further processing. Matching rows go straight into the call/put dicts,
+    # splitting the instrument name once instead of building intermediate dicts.
     calls_dict = {}
     puts_dict = {}
-    for option in filtered:
-        strike = option["strike"]
-        iv = option["mark_iv"]
-        mark_price = round(option["mark_price"], 4)
-
-        if option["option_type"] == "C":
-            calls_dict[strike] = (iv, mark_price)
+    for item in ijson.items(raw, "result.item", use_float=True):
+        name = item["instrument_name"]
+        if expiry_code not in name:
+            continue
+        iv = item["mark_iv"]
+        if iv is None:
+            continue
+        *_, strike_str, option_type = name.rsplit("-", 2)  # option_type is C or P
+        strike = utils.process_strike(strike_str)
+        mark_price = round(item["mark_price"], 4)
+
+        if option_type == "C":
+            calls_dict[strike] = (iv / 100, mark_price)  # mark_iv percentage to decimal
         else:
-            puts_dict[strike] = (iv, mark_price)
-    
+            puts_dict[strike] = (iv / 100, mark_price)
+
     return calls_dict, puts_dict
 
-async def get_existing_futures(session: aiohttp.ClientSession, currency: str) -> List:
+@ttl_cached(ttl=3600)
+async def get_existing_futures(client: httpx.AsyncClient, currency: str) -> List:
     """
     Fetch list of existing futures for a given currency excluding perpetuals.
 
     Args:
-        sesssion (aiohttp.ClientSession): Client sesssion.
+        client (httpx.AsyncClient): HTTP client.
         currency (str): The currency for which to fetch the index price (e.g., 'BTC', 'ETH').
 
     Returns:
@@ -108,18 +159,19 @@ async def get_existing_futures(session: aiohttp.ClientSession, currency: str) ->
         "currency": utils.map_currency(currency),
         "kind": "future"}
     
-    data = await fetch_data(session, url, params)
+    data = await fetch_data(client, url, params)
 
     filtered = [item["instrument_name"] for item in data if currency in item["instrument_name"] if "PERP" not in item["instrument_name"]]
 
     return filtered
 
-async def get_index_price(session: aiohttp.ClientSession, currency: str) -> Optional[float]:
+@ttl_cached(ttl=2)
+async def get_index_price(client: httpx.AsyncClient, currency: str) -> Optional[float]:
     """
     Fetch the current index price for a given currency from Deribit.
 
     Args:
-        sesssion (aiohttp.ClientSession): Client sesssion.
+        client (httpx.AsyncClient): HTTP client.
         currency (str): The currency for which to fetch the index price (e.g., 'BTC', 'ETH').
 
     Returns:
@@ -128,17 +180,17 @@ async def get_index_price(session: aiohttp.ClientSession, currency: str) -> Opti
 
     url = "https://www.deribit.com/api/v2/public/get_index_price"
     params = {"index_name": utils.map_index_name(currency)}
-    data = await fetch_data(session, url, params)
+    data = await fetch_data(client, url, params)
     if data:
         return data.get("index_price")
     return None
 
-async def get_underlying_price(session: aiohttp.ClientSession, currency: str, expiry_code: str) -> Optional[float]:
+async def get_underlying_price(client: httpx.AsyncClient, currency: str, expiry_code: str) -> Optional[float]:
     """
     Fetch the current price of the underlying asset (BTC or ETH) from Deribit.
 
     Args:
-        sesssion (aiohttp.ClientSession): Client sesssion.
+        client (httpx.AsyncClient): HTTP client.
         currency (str): The currency of the asset (e.g., 'BTC' or 'ETH').
         expiry_code (str): The expiry code (e.g., '9MAY25').
 
@@ -151,7 +203,7 @@ async def get_underlying_price(session: aiohttp.ClientSession, currency: str, ex
     else:
         params = {"instrument_name": f"{currency}-{expiry_code}"}
 
-    data = await fetch_data(session, url, params)
+    data = await fetch_data(client, url, params)
     if data:
         return data.get("mark_price")
     return None
\ No newline at end of file
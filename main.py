@@ -1,64 +1,16 @@
 import argparse
 import asyncio
-import aiohttp
+import csv
+import httpx
+import numpy as np
 import time
-from typing import Callable, Dict, List
+from typing import List
 
 import api_requests
 import utils
 import pricing
 
 
-async def process_strike(
-        session: aiohttp.ClientSession,
-        currency: str,
-        strike: float,
-        expiry_code: str,
-        standard_strikes: List,
-        output_dict: Dict,
-        call_iv_fn: Callable,
-        put_iv_fn: Callable,
-        calls_strike_iv: Dict,
-        puts_strike_iv: Dict,
-        index_price: float,
-        existing_futures: List):
-    """
-    Process a single strike asynchronously, including call and put pricing.
-    """
-    if strike in standard_strikes:
-        # Use Mark IV
-        call_iv = calls_strike_iv[strike][0]
-        put_iv = puts_strike_iv[strike][0]
-        call_mark_price_act = calls_strike_iv[strike][1]
-        put_mark_price_act = puts_strike_iv[strike][1]
-    else:
-        # Interpolate IV
-        call_iv = call_iv_fn(strike)
-        put_iv = put_iv_fn(strike)
-        call_mark_price_act = None
-        put_mark_price_act = None
-
-    # price the options using Black 76
-    call_task = pricing.price_option(session, currency, expiry_code, strike, "call", call_iv, existing_futures)
-    put_task = pricing.price_option(session, currency, expiry_code, strike, "put", put_iv, existing_futures)
-
-    call_mark_price_pred, put_mark_price_pred = await asyncio.gather(call_task, put_task)
-
-    # Normalize price to currency in which option is settled
-    if currency.lower() in ['eth', 'btc']:
-        call_mark_price_pred = await pricing.normalize_usd_price_to_currency(call_mark_price_pred, index_price)
-        put_mark_price_pred = await pricing.normalize_usd_price_to_currency(put_mark_price_pred, index_price)
-    else:
-        call_mark_price_pred = round(call_mark_price_pred, 4)
-        put_mark_price_pred = round(put_mark_price_pred, 4)
-
-    output_dict[strike] = {
-        "call_mark_price": call_mark_price_pred,
-        "deribit_call_mark_price": call_mark_price_act,
-        "put_mark_price": put_mark_price_pred,
-        "deribit_put_mark_price": put_mark_price_act,
-    }
-
 async def main_loop(
         currency: str,
         expiry_code: str,
@@ -66,69 +18,122 @@ async def main_loop(
         t2: int,
         strikes: List[float],
         output_file_path: str
-) -> None: 
-    # Create aiohttp Client Session
-    async with aiohttp.ClientSession() as session:
-        # get standard strikes
-        strike_iv_price_dicts = await api_requests.get_strike_iv_price_dict(session, currency, expiry_code)
+) -> None:
+    # Create one httpx client for the whole run. HTTP/2 lets all concurrent
+    # requests multiplex over a single warm TLS connection to deribit.com
+    # instead of opening a socket per request.
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    timeout = httpx.Timeout(10, connect=2)
+    # Ask for compressed responses explicitly; Deribit JSON compresses 3-5x,
+    # which matters most for the book-summary payload
+    headers = {"Accept-Encoding": "gzip, deflate"}
+    async with httpx.AsyncClient(http2=True, limits=limits, timeout=timeout, headers=headers) as client:
+        # Fetch standard strikes and existing futures (those might be needed to
+        # create synthetic underlyings) concurrently
+        strike_iv_price_dicts, existing_futures = await asyncio.gather(
+            api_requests.get_strike_iv_price_dict(client, currency, expiry_code),
+            api_requests.get_existing_futures(client, currency))
         call_strike_iv_price_dict, _ = strike_iv_price_dicts
-        standard_strikes = call_strike_iv_price_dict.keys()
 
-        # Get existing futures since those might be needed to create synthetic underlyings
-        existing_futures = await api_requests.get_existing_futures(session, currency)
-        
+        # Futures sorted by expiry date once; the synthetic-future lookup
+        # bisects this list instead of re-sorting on every call
+        futures_by_expiry = sorted((utils.convert_future_name_to_date(f), f) for f in existing_futures)
+        standard_strikes = frozenset(call_strike_iv_price_dict)
+
         number_of_iterations = int(t1 / t2)
-        iv_interpolation_needed = False
-
-        # Check if there are any non-standard strikes
-        if set(strikes) - set(standard_strikes):
-            iv_interpolation_needed = True
-
-        for _ in range(number_of_iterations):
-            start_time = time.time()
-            # Get implied volatilities for all strikes across the option chain
-            strike_iv_price_dicts = await api_requests.get_strike_iv_price_dict(session, currency, expiry_code)
-            call_strike_iv_price_dict, put_strike_iv_price_dict = strike_iv_price_dicts
-
-            # Get index price
-            index_price = await api_requests.get_index_price(session, currency)
-            
-            # Create the interpolation function only if needed
-            call_iv_fn = None
-            put_iv_fn = None
-            if iv_interpolation_needed:
-                call_iv_fn = await pricing.iv_interpolator(call_strike_iv_price_dict)
-                put_iv_fn = await pricing.iv_interpolator(put_strike_iv_price_dict)
-
-            output_dict = {}
-            # Create tasks for all strikes
-            tasks = [
-                process_strike(
-                    session,
-                    currency,
-                    strike,
-                    expiry_code,
-                    standard_strikes,
-                    output_dict,
-                    call_iv_fn,
-                    put_iv_fn,
-                    call_strike_iv_price_dict,
-                    put_strike_iv_price_dict,
-                    index_price,
-                    existing_futures) for strike in strikes
-            ]
-
-            # Run all tasks concurrently
-            await asyncio.gather(*tasks)
-
-            utils.save(output_dict, output_file_path)
-
-            execution_time = time.time() - start_time
-            print(f"Execution time: {execution_time} seconds")
-
-            sleep_time = t2 - execution_time
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
+
+        # Interpolation is only needed if there are any non-standard strikes
+        iv_interpolation_needed = not set(strikes).issubset(standard_strikes)
+
+        strikes_np = np.asarray(strikes, dtype=float)
+
+        # Keep the output file open for the whole run; rows are appended
+        # through one csv writer instead of re-opening the file and building
+        # a DataFrame every iteration
+        output_file = open(output_file_path, "a", newline="", buffering=1 << 16)
+        writer = csv.DictWriter(output_file, fieldnames=utils.CSV_FIELDNAMES)
+        if output_file.tell() == 0:
+            writer.writeheader()
+
+        try:
+            for _ in range(number_of_iterations):
+                start_time = time.time()
+                # Fetch the option-chain IVs, the index price, and the underlying
+                # future price (shared by every call/put on this expiry)
+                # concurrently instead of paying one round trip after another
+                strike_iv_price_dicts, index_price, future_price = await asyncio.gather(
+                    api_requests.get_strike_iv_price_dict(client, currency, expiry_code),
+                    api_requests.get_index_price(client, currency),
+                    pricing.get_future_price(client, currency, expiry_code, existing_futures, futures_by_expiry))
+                call_strike_iv_price_dict, put_strike_iv_price_dict = strike_iv_price_dicts
+
+                time_to_expiry = utils.convert_expiration_to_years(expiry_code)
+                if index_price is None or future_price is None or time_to_expiry is None:
+                    print(f"Skipping iteration: no index price, future price or expiry for {currency}-{expiry_code}")
+                    continue
+
+                # Create the interpolation function only if needed
+                call_iv_fn = None
+                put_iv_fn = None
+                if iv_interpolation_needed:
+                    call_iv_fn = await pricing.iv_interpolator(call_strike_iv_price_dict)
+                    put_iv_fn = await pricing.iv_interpolator(put_strike_iv_price_dict)
+
+                # Interpolate IVs for the whole strike grid in two vectorized
+                # calls, then overlay Mark IVs wherever the strike is standard
+                if iv_interpolation_needed:
+                    call_ivs = np.asarray(call_iv_fn(strikes_np), dtype=float)
+                    put_ivs = np.asarray(put_iv_fn(strikes_np), dtype=float)
+                else:
+                    call_ivs = np.empty_like(strikes_np)
+                    put_ivs = np.empty_like(strikes_np)
+
+                call_mark_prices_act = []
+                put_mark_prices_act = []
+                for i, strike in enumerate(strikes):
+                    if strike in standard_strikes:
+                        call_ivs[i] = call_strike_iv_price_dict[strike][0]
+                        put_ivs[i] = put_strike_iv_price_dict[strike][0]
+                        call_mark_prices_act.append(call_strike_iv_price_dict[strike][1])
+                        put_mark_prices_act.append(put_strike_iv_price_dict[strike][1])
+                    else:
+                        call_mark_prices_act.append(None)
+                        put_mark_prices_act.append(None)
+
+                # Price all 2N options (calls first, then puts) in one vectorized pass
+                strikes_all = np.concatenate([strikes_np, strikes_np])
+                ivs_all = np.concatenate([call_ivs, put_ivs])
+                is_call = np.arange(strikes_all.size) < strikes_np.size
+                prices = pricing.price_black_76_batch(
+                    future_price, strikes_all, time_to_expiry, ivs_all, is_call)
+
+                # Normalize price to currency in which option is settled
+                if currency.lower() in ['eth', 'btc']:
+                    prices = prices / index_price
+                prices = np.round(prices, 4)
+
+                output_dict = {}
+                number_of_strikes = len(strikes)
+                for i, strike in enumerate(strikes):
+                    output_dict[strike] = {
+                        "call_mark_price": prices[i],
+                        "deribit_call_mark_price": call_mark_prices_act[i],
+                        "put_mark_price": prices[number_of_strikes + i],
+                        "deribit_put_mark_price": put_mark_prices_act[i],
+                    }
+
+                utils.save(output_dict, writer)
+
+                execution_time = time.time() - start_time
+                print(f"Execution time: {execution_time} seconds")
+
+                sleep_time = t2 - execution_time
+                if sleep_time > 0:
+                    await asyncio.sleep(sleep_time)
+        finally:
+            # Close (and flush) even if an iteration blows up, so buffered
+            # rows are not lost with the run
+            output_file.close()
 
 
 
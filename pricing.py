@@ -1,7 +1,8 @@
 from typing import Callable, Dict, List, Optional
 from scipy.interpolate import PchipInterpolator
-from scipy.stats import norm
-import aiohttp
+from scipy.special import ndtr
+import bisect
+import httpx
 import asyncio
 import api_requests
 import utils
@@ -24,123 +25,87 @@ async def iv_interpolator(strike_iv: Dict[float, float]) -> Callable:
     implied_vols = [iv for _, (iv, _) in sorted_strikes_ivs]
     return PchipInterpolator(strikes, implied_vols, extrapolate=True)
 
-async def normalize_usd_price_to_currency(price: float, index_price: float):
-    """
-    Normalize the price to a index_price.
-    Args:
-        price (float): The price to be normalized.
-        index_price (float): Index price in USD.
-    Returns:
-        float: The normalized price.
-    """
-    if price is None or index_price is None:
-        return None
-    return round(price/index_price, 4)
-
-async def price_option(
-        session: aiohttp.ClientSession,
+async def get_future_price(
+        client: httpx.AsyncClient,
         currency: str,
         expiry_code: str,
-        strike: float,
-        option_type: str,
-        iv: float,
-        existing_futures: List) -> Optional[float]:
+        existing_futures: List,
+        futures_by_expiry: List) -> Optional[float]:
     """
-    Calculate the price of an option using the Black-76 model.
+    Resolve the underlying future price for a given expiry.
+
+    The same future price is shared by every option on the expiry, so this is
+    fetched once per iteration instead of once per priced option.
 
     Args:
-        session (aiohttp.ClientSession): Client session.
+        client (httpx.AsyncClient): HTTP client.
         currency (str): The currency of the option (e.g., "BTC").
         expiry_code (str): The expiry code (e.g., "9MAY25").
-        strike (float): The strike price of the option.
-        option_type (str): The type of the option ("call" or "put").
-        iv (float): The implied volatility of the option.
         existing_futures (List): List of existing futures on Deribit for a given currency.
+        futures_by_expiry (List): The same futures as (expiry date, instrument
+            name) pairs sorted by expiry date.
 
     Returns:
-        Optional[float]: The price of the option.
+        Optional[float]: The future price, or None if it could not be fetched.
     """
-    try:
-        if option_type not in ["call", "put"]:
-            raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
-
-        time_to_expiry = utils.convert_expiration_to_years(expiry_code)
-
-        if currency.lower() not in ['eth', 'btc', 'paxg_usdc']:
-            future_name = f"{currency}-PERPETUAL"
-        else:
-            future_name = f"{currency}-{expiry_code}"
-
-        if future_name not in existing_futures and currency.lower() in ['eth', 'btc', 'paxg_usdc']:
-            future_price = await create_synthetic_future_price(session, currency, expiry_code, existing_futures)
-        else:
-            future_price = await api_requests.get_underlying_price(session, currency, expiry_code)
-        if future_price is None:
-            raise ValueError(f"Failed to fetch future price for {currency} and expiry_code: {expiry_code}")
-
-        return await price_black_76(future_price, strike, time_to_expiry, iv, option_type)
-    except Exception as e:
-        print(f"Error in price_option for {currency}, {expiry_code}, {strike}, {option_type}: {e}")
-        return None
+    if currency.lower() not in ['eth', 'btc', 'paxg_usdc']:
+        future_name = f"{currency}-PERPETUAL"
+    else:
+        future_name = f"{currency}-{expiry_code}"
+
+    if future_name not in existing_futures and currency.lower() in ['eth', 'btc', 'paxg_usdc']:
+        return await create_synthetic_future_price(client, currency, expiry_code, futures_by_expiry)
+    return await api_requests.get_underlying_price(client, currency, expiry_code)
 
 async def create_synthetic_future_price(
-        session: aiohttp.ClientSession,
+        client: httpx.AsyncClient,
         currency: str,
         expiry_code: str,
-        existing_futures: List) -> float:
+        futures_by_expiry: List) -> Optional[float]:
     """
     Creates synthetic future based on the existing futures interpolation/extrapolation.
 
     Args:
-        sesssion (aiohttp.ClientSession): Client sesssion.
+        client (httpx.AsyncClient): HTTP client.
         currency (str): The currency of the option (e.g., "BTC").
         expiry_code (str): The expiry code (e.g., "9MAY25").
-        existing_futures (List): List of existing futures on Deribit for a given currency.
+        futures_by_expiry (List): (expiry date, instrument name) pairs of the
+            existing futures, sorted by expiry date.
 
     Returns:
-        float: Synthethic future price
+        Optional[float]: Synthethic future price, or None if it cannot be interpolated.
     """
-    
-    # find sorouding futures
-    target_future = f"{currency}-{expiry_code}"
 
-    # Convert all existing futures expiration dates to datetime objects
-    existing_dates = [(future, utils.convert_future_name_to_date(future)) for future in existing_futures]
+    # Interpolation needs two futures to draw a line through
+    if len(futures_by_expiry) < 2:
+        print(f"Cannot build synthetic future for {currency}-{expiry_code}: "
+              f"only {len(futures_by_expiry)} futures listed")
+        return None
 
     # Convert the target future expiration date
-    target_date = utils.convert_future_name_to_date(target_future)
-
-    # Sort the existing futures by expiration date
-    existing_dates.sort(key=lambda x: x[1])
-
-    # Find the two surrounding futures for the target future
-    for i in range(1, len(existing_dates)):
-        if target_date < existing_dates[0][1]:
-            # Extrapolate before first known future
-            prev_expiry_code = existing_dates[0][0].split('-')[-1]
-            next_expiry_code = existing_dates[1][0].split('-')[-1]
-            prev_expiry_date = existing_dates[0][1]
-            next_expiry_date = existing_dates[1][1]
-            break
-        elif target_date > existing_dates[-1][1]:
-            # Extrapolate after last known future
-            prev_expiry_code = existing_dates[-2][0].split('-')[-1]
-            next_expiry_code = existing_dates[-1][0].split('-')[-1]
-            prev_expiry_date = existing_dates[-2][1]
-            next_expiry_date = existing_dates[-1][1]
-            break
-        elif existing_dates[i][1] > target_date:
-            # Interpolate between two known futures
-            prev_expiry_code = existing_dates[i - 1][0].split('-')[-1]
-            next_expiry_code = existing_dates[i][0].split('-')[-1]
-            prev_expiry_date = existing_dates[i - 1][1]
-            next_expiry_date = existing_dates[i][1]
-            break
-    
-    prev_future_task = api_requests.get_underlying_price(session, currency, prev_expiry_code)
-    next_future_task = api_requests.get_underlying_price(session, currency, next_expiry_code)
+    target_date = utils.convert_future_name_to_date(f"{currency}-{expiry_code}")
+
+    # Find the two surrounding futures for the target future; clamping the
+    # index to the ends makes the price extrapolate when the target expiry
+    # falls outside the listed futures
+    expiry_dates = [date for date, _ in futures_by_expiry]
+    idx = bisect.bisect_left(expiry_dates, target_date)
+    idx = min(max(idx, 1), len(futures_by_expiry) - 1)
+
+    prev_expiry_date, prev_future = futures_by_expiry[idx - 1]
+    next_expiry_date, next_future = futures_by_expiry[idx]
+    prev_expiry_code = prev_future.split('-')[-1]
+    next_expiry_code = next_future.split('-')[-1]
+
+    prev_future_task = api_requests.get_underlying_price(client, currency, prev_expiry_code)
+    next_future_task = api_requests.get_underlying_price(client, currency, next_expiry_code)
 
     prev_future_price, next_future_price = await asyncio.gather(prev_future_task, next_future_task)
+    if prev_future_price is None or next_future_price is None:
+        print(f"Cannot build synthetic future for {currency}-{expiry_code}: "
+              f"missing price for {prev_future} or {next_future}")
+        return None
+
     # Calculate the time differences in days
     time_diff_target_prev = (target_date - prev_expiry_date).days
     time_diff_next_prev = (next_expiry_date - prev_expiry_date).days
@@ -150,36 +115,48 @@ async def create_synthetic_future_price(
     
     return interpolated_price
 
-async def price_black_76(F: float, K: float, T: float, iv: float, option_type: str) -> Optional[float]:
+def price_black_76_batch(
+        F: float,
+        K: np.ndarray,
+        T: float,
+        iv: np.ndarray,
+        is_call: np.ndarray) -> np.ndarray:
     """
-    Calculate the price of an option using the Black-76 model.
+    Calculate Black-76 prices for a whole batch of options in one vectorized pass.
+
+    All options in the batch share the same underlying price and expiry, which
+    is exactly the shape of one pricing iteration (call + put for every strike).
 
     Args:
         F (float): The current underlying price.
-        K (float): The strike price of the option.
+        K (np.ndarray): Strike prices, one per option.
         T (float): The time to expiration in years.
-        iv (float): The implied volatility of the option.
-        option_type (str): The type of the option ("call" or "put").
+        iv (np.ndarray): Implied volatilities, one per option.
+        is_call (np.ndarray): Boolean mask, True for calls and False for puts.
 
     Returns:
-        Optional[float]: The price of the option.
+        np.ndarray: Option prices in the same order as the inputs. Options with
+        an unusable IV (or a non-positive time to expiry) come back as NaN.
     """
+    prices = np.full(K.shape, np.nan)
+    if T <= 0:
+        return prices
+
+    # Deep OTM quotes can come back with zero or missing IV; mask those lanes
+    # out before the log/CDF work instead of computing NaNs the long way
+    valid = iv > 0
+    if not valid.any():
+        return prices
 
-    try:
-        if option_type not in ["call", "put"]:
-            raise ValueError("Invalid option_type. Must be 'call' or 'put'.")
+    K_v = K[valid]
+    iv_v = iv[valid]
 
-        d1 = (np.log(F / K) + 0.5 * iv ** 2 * T) / (iv * np.sqrt(T))
-        d2 = d1 - iv * np.sqrt(T)
+    sqrt_T = np.sqrt(T)
+    d1 = (np.log(F / K_v) + 0.5 * iv_v ** 2 * T) / (iv_v * sqrt_T)
+    d2 = d1 - iv_v * sqrt_T
 
-        if option_type == "call":
-            price = np.exp(-0 * T) * (F * norm.cdf(d1) - K * norm.cdf(d2))
-        elif option_type == "put":
-            price = np.exp(-0 * T) * (K * norm.cdf(-d2) - F * norm.cdf(-d1))
-        else:
-            raise ValueError("option_type must be 'call' or 'put'")
+    call_prices = F * ndtr(d1) - K_v * ndtr(d2)
+    put_prices = K_v * ndtr(-d2) - F * ndtr(-d1)
 
-        return price
-    except Exception as e:
-        print(f"Error in price_black_76: {e}")
-        return None
\ No newline at end of file
+    prices[valid] = np.where(is_call[valid], call_prices, put_prices)
+    return prices
@@ -1,8 +1,15 @@
+import csv
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, Optional
-import pandas as pd
 import re
 
+# Column layout of the output CSV, shared with the writer set up in main_loop
+CSV_FIELDNAMES = ["timestamp", "strike_price", "option_type", "deribit_mark_price", "computed_mark_price"]
+
+# Compiled once at import; matched on every (uncached) expiry-code parse
+_EXPIRY_RE = re.compile(r"(\d{1,2})([A-Z]{3})(\d{2})")
+
 def map_currency(currency: str) -> str:
     """
     Map currency pairs like PAXG_USDC to currency in which contract is settled.
@@ -43,45 +50,61 @@ def process_strike(strike: str) -> float:
     """
     return float(strike.replace('d', '.'))
 
-def save(output_dict: Dict, output_file: str) -> None:
+def save(output_dict: Dict, writer: csv.DictWriter) -> None:
     """
-    Save the output dictionary to a CSV file in a structured format.
+    Append the output dictionary rows to the run's CSV writer.
+
+    The file handle and writer live on the main loop for the whole run, so
+    each iteration only appends rows instead of rebuilding a DataFrame and
+    re-opening the file.
 
     Args:
         output_dict (Dict): Dictionary with output data.
-        output_file (str): Output file path
+        writer (csv.DictWriter): Writer bound to the output file.
     """
-    # Convert the output dictionary to a list of rows
-    rows = []
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    for strike, data in sorted(output_dict.items()):
-        rows.append({
-            "timestamp": timestamp,
-            "strike_price": strike,
-            "option_type": "call",
-            "deribit_mark_price": data["deribit_call_mark_price"],
-            "computed_mark_price": data["call_mark_price"]
-        })
-        rows.append({
-            "timestamp": timestamp,
-            "strike_price": strike,
-            "option_type": "put",
-            "deribit_mark_price": data["deribit_put_mark_price"],
-            "computed_mark_price": data["put_mark_price"]
-        })
-
-    # Convert rows to a DataFrame
-    df = pd.DataFrame(rows)
-
-    # Save to a CSV file (append if the file already exists)
     try:
-        # If the file exists, append without writing the header again
-        with open(output_file, "a") as f:
-            df.to_csv(f, index=False, header=f.tell() == 0)
+        for strike, data in sorted(output_dict.items()):
+            writer.writerow({
+                "timestamp": timestamp,
+                "strike_price": strike,
+                "option_type": "call",
+                "deribit_mark_price": data["deribit_call_mark_price"],
+                "computed_mark_price": data["call_mark_price"]
+            })
+            writer.writerow({
+                "timestamp": timestamp,
+                "strike_price": strike,
+                "option_type": "put",
+                "deribit_mark_price": data["deribit_put_mark_price"],
+                "computed_mark_price": data["put_mark_price"]
+            })
     except Exception as e:
         print(f"Error saving data: {e}")
 
-    print(f"Data saved to {output_file}")
+@lru_cache(maxsize=128)
+def _parse_expiration(expiration: str) -> datetime:
+    """
+    Parse an expiration code like "9MAY25" into a UTC datetime at 08:00.
+
+    Cached because the same expiration string is parsed on every pricing call
+    while the resulting datetime never changes.
+
+    Args:
+        expiration (str): The expiration date in the format "DDMMMYY" (e.g., "9MAY25").
+
+    Returns:
+        datetime: The expiration datetime in UTC.
+    """
+    match = _EXPIRY_RE.match(expiration.upper())
+    if not match:
+        raise ValueError(f"Invalid expiration format: {expiration}")
+    day, month, year = match.groups()
+    normalized_date = f"{int(day):02d}{month}{year}"
+
+    # Create a datetime object for the expiration date
+    expiration_date = datetime.strptime(normalized_date, "%d%b%y")
+    return expiration_date.replace(hour=8, tzinfo=timezone.utc)
 
 def convert_expiration_to_years(expiration: str) -> Optional[float]:
     """
@@ -94,15 +117,7 @@ def convert_expiration_to_years(expiration: str) -> Optional[float]:
         Optional[float]: The time to expiration in years.
     """
     try:
-        match = re.match(r"(\d{1,2})([A-Z]{3})(\d{2})", expiration.upper())
-        if not match:
-            raise ValueError(f"Invalid expiration format: {expiration}")
-        day, month, year = match.groups()
-        normalized_date = f"{int(day):02d}{month}{year}"
-
-        # Create a datetime object for the expiration date
-        expiration_date = datetime.strptime(normalized_date, "%d%b%y")
-        expiration_date = expiration_date.replace(hour=8, tzinfo=timezone.utc)
+        expiration_date = _parse_expiration(expiration)
 
         # Ensure current_date is also UTC-aware
         current_date = datetime.now(timezone.utc)
@@ -118,6 +133,7 @@ def convert_expiration_to_years(expiration: str) -> Optional[float]:
         print(f"Error in convert_expiration_to_years: {e}")
         return None
     
+@lru_cache(maxsize=128)
 def convert_future_name_to_date(future_str: str) -> datetime:
     # Extract the expiration part from the future string
     expiration_str = future_str.split(('-'))[-1]